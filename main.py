@@ -1,25 +1,60 @@
-from typing import List, Optional
+import asyncio
+import hashlib
+import logging
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple, Union
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException, Depends, Query
-from pydantic import BaseModel, Field
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, Text, TIMESTAMP
+import orjson
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from fastapi import FastAPI, HTTPException, Depends, Query, Body, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import (
+    Column, Integer, String, Float, Boolean, Text, TIMESTAMP, Index, FetchedValue,
+    select, insert, update, delete, text, func
+)
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
 
-# Database configuration for XAMPP MySQL
-DATABASE_URL = "mysql+pymysql://root@localhost:3306/product_catalog"
+# Database configuration for XAMPP MySQL (asyncmy: compiled asyncio driver)
+DATABASE_URL = "mysql+asyncmy://root@localhost:3306/product_catalog"
 
-# Create SQLAlchemy engine
-engine = create_engine(
+# Create SQLAlchemy async engine
+# Each worker process holds up to pool_size + max_overflow connections, so
+# MySQL's max_connections must be >= workers * (pool_size + max_overflow).
+engine = create_async_engine(
     DATABASE_URL,
+    pool_size=20,        # Persistent connections kept per worker
+    max_overflow=20,     # Extra connections allowed under burst load
+    pool_timeout=30,     # Seconds to wait for a free connection
     pool_pre_ping=True,  # Enable connection health checks
     pool_recycle=3600,   # Recycle connections after 1 hour
+    query_cache_size=1200,  # Compiled SQL cache, keyed on statement shape
     echo=False           # Set to True for SQL query logging
 )
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False  # Keep attributes loaded after commit (no lazy IO)
+)
+
+# Shared Redis cache, so every worker sees the same entries and invalidations.
+# Short timeouts keep a hung Redis from stalling reads and writes; on a
+# timeout the API falls back to MySQL like it does when Redis is down.
+REDIS_URL = "redis://localhost:6379/0"
+redis_client = redis.Redis.from_url(
+    REDIS_URL,
+    socket_timeout=0.5,
+    socket_connect_timeout=0.5
+)
+
+logger = logging.getLogger(__name__)
 
 # Base class for ORM models
 Base = declarative_base()
@@ -28,29 +63,55 @@ Base = declarative_base()
 # SQLAlchemy ORM Model
 class ProductModel(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Covers the combined category + in_stock filter on /products
+        Index("ix_products_category_instock", "category", "in_stock"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     price = Column(Float, nullable=False)
     description = Column(Text, nullable=True)
-    category = Column(String(50), default="General")
-    in_stock = Column(Boolean, default=True)
-    created_at = Column(TIMESTAMP)
-    updated_at = Column(TIMESTAMP)
+    category = Column(String(50), default="General", index=True)
+    in_stock = Column(Boolean, default=True, index=True)
+    # Timestamps are maintained by MySQL, never written from Python
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    updated_at = Column(
+        TIMESTAMP,
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue()
+    )
+
+
+# Columns exposed by the API, for read paths that skip ORM materialization
+PRODUCT_COLUMNS = (
+    ProductModel.id,
+    ProductModel.name,
+    ProductModel.price,
+    ProductModel.description,
+    ProductModel.category,
+    ProductModel.in_stock,
+)
 
 
 # Pydantic Models for API
 class Product(BaseModel):
     """Product response model"""
+    model_config = ConfigDict(from_attributes=True)  # Enable ORM mode for SQLAlchemy
+    
     id: int
     name: str
     price: float
     description: Optional[str] = None
     category: str = "General"
     in_stock: bool = True
-    
-    class Config:
-        from_attributes = True  # Enable ORM mode for SQLAlchemy
+
+
+class ProductPage(BaseModel):
+    """Keyset-paginated product list"""
+    items: List[Product]
+    next_cursor: Optional[int] = None
 
 
 class ProductCreate(BaseModel):
@@ -71,22 +132,130 @@ class ProductUpdate(BaseModel):
     in_stock: Optional[bool] = None
 
 
+# Redis keys for the category list; bump the version if its format changes.
+# Writers bump the generation counter instead of deleting the list, and a
+# cached list only counts as a hit while its generation is still current.
+# That way a reader that queried MySQL before a write committed cannot put
+# its stale list back after the writer invalidated it.
+CATEGORIES_CACHE_KEY = "categories:v2"
+CATEGORIES_GENERATION_KEY = "categories:v2:generation"
+CATEGORIES_CACHE_TTL = 300
+_categories_lock = asyncio.Lock()
+
+
+async def invalidate_categories():
+    """Invalidate the cached category list after a write that may change it"""
+    try:
+        await redis_client.incr(CATEGORIES_GENERATION_KEY)
+    except RedisError as e:
+        logger.warning("Failed to invalidate %s: %s", CATEGORIES_CACHE_KEY, e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the Redis connection pool on shutdown"""
+    yield
+    await redis_client.aclose()
+
+
 # FastAPI app initialization
 app = FastAPI(
     title="Product Catalog API with MySQL",
     description="AI-ready product catalog API with XAMPP MySQL database integration",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 
 # Dependency to get database session
-def get_db():
+async def get_db():
     """Create database session for each request"""
+    async with SessionLocal() as db:
+        yield db
+
+
+def set_cache_headers(request: Request, response: Response, etag: str, max_age: int) -> bool:
+    """Set ETag/Cache-Control headers; return True if the client's copy is current"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"private, max-age={max_age}"
+    
+    for tag in request.headers.get("if-none-match", "").split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in (etag, "*"):
+            return True
+    return False
+
+
+# Largest list accepted by the bulk and batched-lookup endpoints
+MAX_BULK_ITEMS = 1000
+
+# Rows fetched per round trip when streaming large responses
+STREAM_BATCH_SIZE = 100
+
+
+async def open_product_stream(stmt):
+    """Open a session and a server-side cursor for a streamed product list.
+    
+    Called before the StreamingResponse is built, so connection and SQL errors
+    still produce an error status rather than a truncated 200 body.
+    """
     db = SessionLocal()
     try:
-        yield db
+        result = await db.stream(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+    except Exception:
+        await db.close()
+        raise
+    return db, result
+
+
+def streaming_products_response(db: AsyncSession, body, media_type: str) -> StreamingResponse:
+    """Wrap a product stream in a StreamingResponse.
+    
+    The background close covers a client that disconnects before the body
+    generator ever starts, when the generator's own cleanup never runs.
+    """
+    return StreamingResponse(body, media_type=media_type, background=BackgroundTask(db.close))
+
+
+async def stream_products(db: AsyncSession, result, limit: int, paginated: bool = False):
+    """Stream a product list as JSON, one batch of rows at a time.
+    
+    Rows come from a server-side cursor, so memory stays bounded by
+    STREAM_BATCH_SIZE rather than the page size.
+    """
+    try:
+        yield b'{"items":[' if paginated else b"["
+        
+        count = 0
+        last_id = None
+        async for rows in result.partitions():
+            chunk = b",".join(orjson.dumps(dict(row._mapping)) for row in rows)
+            yield b"," + chunk if count else chunk
+            count += len(rows)
+            last_id = rows[-1].id
+        
+        if paginated:
+            next_cursor = last_id if count == limit else None
+            yield b'],"next_cursor":' + orjson.dumps(next_cursor) + b"}"
+        else:
+            yield b"]"
     finally:
-        db.close()
+        await db.close()
+
+
+async def stream_products_ndjson(db: AsyncSession, result):
+    """Stream products as newline-delimited JSON from a server-side cursor."""
+    try:
+        async for rows in result.partitions():
+            yield b"".join(
+                orjson.dumps(dict(row._mapping), option=orjson.OPT_APPEND_NEWLINE)
+                for row in rows
+            )
+    finally:
+        await db.close()
 
 
 @app.get("/", tags=["Root"])
@@ -99,46 +268,98 @@ async def root():
     }
 
 
-@app.get("/products", response_model=List[Product], tags=["Products"])
+@app.get(
+    "/products",
+    responses={200: {"model": Union[List[Product], ProductPage]}},
+    tags=["Products"]
+)
 async def list_products(
     category: Optional[str] = Query(None, description="Filter by category"),
     in_stock: Optional[bool] = Query(None, description="Filter by stock status"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=500, description="Maximum records to return"),
-    db: Session = Depends(get_db)
-) -> List[Product]:
-    """Retrieve products with optional filters and pagination."""
-    query = db.query(ProductModel)
+    limit: int = Query(50, ge=1, le=200, description="Maximum records to return (use /products/export for more)"),
+    cursor: Optional[int] = Query(
+        None, ge=0, description="Return products after this ID (keyset pagination, ignores skip)"
+    )
+) -> StreamingResponse:
+    """Retrieve products with optional filters and pagination.
+    
+    With `cursor`, returns `{items, next_cursor}`; pass `next_cursor` back to
+    fetch the following page. Start the walk with `cursor=0`.
+    """
+    # Plain rows are enough for a read-only list; skip ORM instances
+    stmt = select(*PRODUCT_COLUMNS)
     
-    # Apply filters
+    # Apply filters; values are bound parameters, so every category/in_stock
+    # value reuses the same compiled statement
     if category:
-        query = query.filter(ProductModel.category == category)
+        stmt = stmt.where(ProductModel.category == category)
     if in_stock is not None:
-        query = query.filter(ProductModel.in_stock == in_stock)
+        stmt = stmt.where(ProductModel.in_stock == in_stock)
+    
+    # Apply pagination. The keyset walk seeks straight to the cursor in the
+    # index (InnoDB secondary indexes end with the primary key) instead of
+    # scanning and discarding `skip` rows.
+    if cursor is not None:
+        stmt = stmt.where(ProductModel.id > cursor).order_by(ProductModel.id)
+    else:
+        stmt = stmt.offset(skip)
     
-    # Apply pagination
-    products = query.offset(skip).limit(limit).all()
-    return products
+    db, result = await open_product_stream(stmt.limit(limit))
+    return streaming_products_response(
+        db,
+        stream_products(db, result, limit, paginated=cursor is not None),
+        media_type="application/json"
+    )
+
+
+@app.get("/products/export", tags=["Products"])
+async def export_products(
+    category: Optional[str] = Query(None, description="Filter by category"),
+    in_stock: Optional[bool] = Query(None, description="Filter by stock status")
+) -> StreamingResponse:
+    """Export every matching product as NDJSON, one product per line."""
+    stmt = select(*PRODUCT_COLUMNS).order_by(ProductModel.id)
+    if category:
+        stmt = stmt.where(ProductModel.category == category)
+    if in_stock is not None:
+        stmt = stmt.where(ProductModel.in_stock == in_stock)
+    
+    db, result = await open_product_stream(stmt)
+    return streaming_products_response(
+        db, stream_products_ndjson(db, result), media_type="application/x-ndjson"
+    )
 
 
 @app.get("/products/{product_id}", response_model=Product, tags=["Products"])
 async def get_product(
     product_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ) -> Product:
     """Retrieve a specific product by its identifier."""
-    product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
+    product = await db.get(ProductModel, product_id)
     
     if not product:
         raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
     
-    return product
+    # Hash the representation itself: updated_at only has whole-second
+    # precision, so two writes in the same second would share a version
+    body = orjson.dumps(Product.model_validate(product).model_dump())
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    if set_cache_headers(request, response, etag, max_age=30):
+        return Response(status_code=304, headers=response.headers)
+    
+    # Send the bytes already encoded for the ETag rather than letting FastAPI
+    # validate and serialize the product a second time
+    return Response(body, media_type="application/json", headers=response.headers)
 
 
 @app.post("/products", response_model=Product, status_code=201, tags=["Products"])
 async def create_product(
     product: ProductCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Product:
     """Add a new product to the catalog."""
     # Create new product instance
@@ -150,34 +371,96 @@ async def create_product(
         in_stock=product.in_stock
     )
     
-    # Add to database
+    # Add to database; the INSERT fills in db_product.id and, with
+    # expire_on_commit=False, nothing needs reloading afterwards
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
+    await db.commit()
+    await invalidate_categories()
     
     return db_product
 
 
+@app.post("/products/bulk", status_code=201, tags=["Products"])
+async def create_products_bulk(
+    products: List[ProductCreate] = Body(
+        ..., max_length=MAX_BULK_ITEMS, description=f"Up to {MAX_BULK_ITEMS} products"
+    ),
+    db: AsyncSession = Depends(get_db)
+):
+    """Add many products in a single INSERT."""
+    if products:
+        await db.execute(insert(ProductModel), [p.model_dump() for p in products])
+        await db.commit()
+        await invalidate_categories()
+    
+    return {"created": len(products)}
+
+
+@app.delete("/products/bulk", tags=["Products"])
+async def delete_products_bulk(
+    ids: List[int] = Body(
+        ..., max_length=MAX_BULK_ITEMS, description=f"Up to {MAX_BULK_ITEMS} IDs to delete"
+    ),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete many products in a single DELETE."""
+    deleted = 0
+    if ids:
+        result = await db.execute(delete(ProductModel).where(ProductModel.id.in_(ids)))
+        await db.commit()
+        deleted = result.rowcount
+        await invalidate_categories()
+    
+    return {"deleted": deleted}
+
+
+@app.post(
+    "/products/by-ids",
+    response_model=None,
+    responses={200: {"model": List[Product]}},
+    tags=["Products"]
+)
+async def get_products_by_ids(
+    ids: List[int] = Body(
+        ..., max_length=MAX_BULK_ITEMS, description=f"Up to {MAX_BULK_ITEMS} IDs to fetch"
+    ),
+    db: AsyncSession = Depends(get_db)
+) -> List[dict]:
+    """Retrieve many products in a single query. Unknown IDs are skipped."""
+    if not ids:
+        return []
+    
+    stmt = select(*PRODUCT_COLUMNS).where(ProductModel.id.in_(ids)).order_by(ProductModel.id)
+    result = await db.execute(stmt)
+    return [dict(row._mapping) for row in result]
+
+
 @app.put("/products/{product_id}", response_model=Product, tags=["Products"])
 async def update_product(
     product_id: int,
     product_update: ProductUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Product:
     """Update an existing product."""
-    # Find product
-    db_product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
+    # Update fields if provided, straight in SQL without loading the row first.
+    # rowcount is the number of matched rows (the MySQL dialects enable
+    # CLIENT_FOUND_ROWS), so it doubles as the existence check.
+    update_data = product_update.model_dump(exclude_unset=True)
+    if update_data:
+        stmt = update(ProductModel).where(ProductModel.id == product_id).values(**update_data)
+        result = await db.execute(stmt)
+        if result.rowcount == 0:
+            raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
+    
+    # MySQL has no UPDATE ... RETURNING, so read the row back in the same transaction
+    db_product = await db.get(ProductModel, product_id)
     
     if not db_product:
         raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
     
-    # Update fields if provided
-    update_data = product_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_product, field, value)
-    
-    db.commit()
-    db.refresh(db_product)
+    await db.commit()
+    if "category" in update_data:
+        await invalidate_categories()
     
     return db_product
 
@@ -185,38 +468,113 @@ async def update_product(
 @app.delete("/products/{product_id}", status_code=204, tags=["Products"])
 async def delete_product(
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a product from the catalog."""
-    db_product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
+    db_product = await db.get(ProductModel, product_id)
     
     if not db_product:
         raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
     
-    db.delete(db_product)
-    db.commit()
+    await db.delete(db_product)
+    await db.commit()
+    await invalidate_categories()
     
     return None
 
 
 @app.get("/categories", tags=["Categories"])
-async def list_categories(db: Session = Depends(get_db)):
+async def list_categories(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
     """Get all unique product categories."""
-    categories = db.query(ProductModel.category).distinct().all()
-    return {"categories": [cat[0] for cat in categories]}
+    categories = await load_categories(db)
+    
+    # The list is sorted, so equal category sets always hash the same
+    etag = f'"{hashlib.md5(orjson.dumps(categories)).hexdigest()}"'
+    if set_cache_headers(request, response, etag, max_age=300):
+        return Response(status_code=304, headers=response.headers)
+    
+    return categories
+
+
+async def load_categories(db: AsyncSession) -> dict:
+    """Return the category list, from Redis when possible"""
+    categories, generation = await get_cached_categories()
+    if categories is not None:
+        return categories
+    
+    # Redis is unavailable: go straight to MySQL rather than queueing on the
+    # lock behind other requests that would each wait out the Redis timeout
+    if generation is None:
+        return await query_categories(db)
+    
+    async with _categories_lock:
+        # Another request in this worker may have filled the cache meanwhile
+        categories, generation = await get_cached_categories()
+        if categories is not None:
+            return categories
+        
+        categories = await query_categories(db)
+        
+        # Tag the list with the generation read *before* the query; if a write
+        # lands in between, the generation has moved on and this entry is a miss
+        if generation is not None:
+            entry = {"generation": generation, "categories": categories}
+            try:
+                await redis_client.set(
+                    CATEGORIES_CACHE_KEY, orjson.dumps(entry), ex=CATEGORIES_CACHE_TTL
+                )
+            except RedisError as e:
+                logger.warning("Failed to cache %s: %s", CATEGORIES_CACHE_KEY, e)
+    
+    return categories
+
+
+async def query_categories(db: AsyncSession) -> dict:
+    """Read the distinct category list from MySQL"""
+    # Answered from ix_products_category with a loose index scan: MySQL
+    # jumps between distinct keys instead of reading every product row
+    stmt = select(ProductModel.category).distinct().order_by(ProductModel.category)
+    result = await db.execute(stmt)
+    return {"categories": result.scalars().all()}
+
+
+async def get_cached_categories() -> Tuple[Optional[dict], Optional[int]]:
+    """Read the category list and current generation from Redis.
+    
+    The list is None on a miss or a stale entry; both are None if Redis is down.
+    """
+    try:
+        cached, generation = await redis_client.mget(
+            CATEGORIES_CACHE_KEY, CATEGORIES_GENERATION_KEY
+        )
+    except RedisError as e:
+        logger.warning("Failed to read %s: %s", CATEGORIES_CACHE_KEY, e)
+        return None, None
+    
+    generation = int(generation or 0)
+    if cached is not None:
+        entry = orjson.loads(cached)
+        if entry["generation"] == generation:
+            return entry["categories"], generation
+    return None, generation
 
 
 @app.get("/health", tags=["Health"])
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     """Check API and database health."""
     try:
         # Test database connection
-        from sqlalchemy import text
-        db.execute(text("SELECT 1"))
-        return {
+        await db.execute(text("SELECT 1"))
+        # Returned as a response directly so FastAPI skips jsonable_encoder
+        # and orjson encodes the datetime itself
+        return ORJSONResponse({
             "status": "healthy",
             "database": "connected",
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": datetime.now()
+        })
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Database unavailable: {str(e)}")
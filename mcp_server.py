@@ -1,4 +1,5 @@
-from typing import List, Optional
+import asyncio
+from typing import List, Optional, Union
 import httpx
 from fastmcp import FastMCP
 
@@ -7,34 +8,46 @@ FASTAPI_BASE_URL = "http://127.0.0.1:8000"
 
 mcp = FastMCP(name="Product Catalog MCP Server with MySQL")
 
+# Shared HTTP client so tool calls reuse keep-alive connections to the API
+_client = httpx.AsyncClient(
+    base_url=FASTAPI_BASE_URL,
+    timeout=10.0,
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+)
+
 
 @mcp.tool()
 async def list_products(
     category: Optional[str] = None,
     in_stock: Optional[bool] = None,
-    limit: int = 100
-) -> List[dict]:
+    limit: int = 50,
+    cursor: Optional[int] = None
+) -> Union[List[dict], dict]:
     """
     List all products from the MySQL database with optional filters.
     
     Args:
         category: Filter products by category (e.g., 'Electronics', 'Accessories')
         in_stock: Filter by stock availability (True/False)
-        limit: Maximum number of products to return (default: 100)
+        limit: Maximum number of products to return (default: 50, max: 200)
+        cursor: Return products after this ID; the result is then
+            {'items': [...], 'next_cursor': ...}. Use 0 for the first page.
     """
     params = {"limit": limit}
+    if cursor is not None:
+        params["cursor"] = cursor
     if category:
         params["category"] = category
     if in_stock is not None:
         params["in_stock"] = str(in_stock).lower()
     
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.get(f"{FASTAPI_BASE_URL}/products", params=params)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPError as e:
-            return {"error": f"Failed to fetch products: {str(e)}"}
+    try:
+        response = await _client.get("/products", params=params)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        return {"error": f"Failed to fetch products: {str(e)}"}
 
 
 @mcp.tool()
@@ -45,17 +58,32 @@ async def get_product(product_id: int) -> dict:
     Args:
         product_id: The unique identifier of the product
     """
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.get(f"{FASTAPI_BASE_URL}/products/{product_id}")
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return {"error": f"Product {product_id} not found"}
-            return {"error": f"Failed to fetch product: {str(e)}"}
-        except httpx.HTTPError as e:
-            return {"error": f"Connection error: {str(e)}"}
+    try:
+        response = await _client.get(f"/products/{product_id}")
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return {"error": f"Product {product_id} not found"}
+        return {"error": f"Failed to fetch product: {str(e)}"}
+    except httpx.HTTPError as e:
+        return {"error": f"Connection error: {str(e)}"}
+
+
+@mcp.tool()
+async def get_products_by_ids(ids: List[int]) -> Union[List[dict], dict]:
+    """
+    Retrieve several products by their IDs in one request.
+    
+    Args:
+        ids: IDs of the products to fetch (up to 1000); IDs that do not exist are skipped
+    """
+    try:
+        response = await _client.post("/products/by-ids", json=ids)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        return {"error": f"Failed to fetch products: {str(e)}"}
 
 
 @mcp.tool()
@@ -84,16 +112,32 @@ async def create_product(
         "in_stock": in_stock
     }
     
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.post(
-                f"{FASTAPI_BASE_URL}/products",
-                json=product_data
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPError as e:
-            return {"error": f"Failed to create product: {str(e)}"}
+    try:
+        response = await _client.post(
+            "/products",
+            json=product_data
+        )
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        return {"error": f"Failed to create product: {str(e)}"}
+
+
+@mcp.tool()
+async def create_products_bulk(products: List[dict]) -> dict:
+    """
+    Add many products to the catalog in one request.
+    
+    Args:
+        products: List of up to 1000 products, each with 'name' and 'price' and
+            optionally 'description', 'category' and 'in_stock'
+    """
+    try:
+        response = await _client.post("/products/bulk", json=products)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        return {"error": f"Failed to create products: {str(e)}"}
 
 
 @mcp.tool()
@@ -128,20 +172,19 @@ async def update_product(
     if in_stock is not None:
         update_data["in_stock"] = in_stock
     
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.put(
-                f"{FASTAPI_BASE_URL}/products/{product_id}",
-                json=update_data
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return {"error": f"Product {product_id} not found"}
-            return {"error": f"Failed to update product: {str(e)}"}
-        except httpx.HTTPError as e:
-            return {"error": f"Connection error: {str(e)}"}
+    try:
+        response = await _client.put(
+            f"/products/{product_id}",
+            json=update_data
+        )
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return {"error": f"Product {product_id} not found"}
+        return {"error": f"Failed to update product: {str(e)}"}
+    except httpx.HTTPError as e:
+        return {"error": f"Connection error: {str(e)}"}
 
 
 @mcp.tool()
@@ -152,17 +195,32 @@ async def delete_product(product_id: int) -> dict:
     Args:
         product_id: ID of the product to delete
     """
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.delete(f"{FASTAPI_BASE_URL}/products/{product_id}")
-            response.raise_for_status()
-            return {"success": True, "message": f"Product {product_id} deleted"}
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return {"error": f"Product {product_id} not found"}
-            return {"error": f"Failed to delete product: {str(e)}"}
-        except httpx.HTTPError as e:
-            return {"error": f"Connection error: {str(e)}"}
+    try:
+        response = await _client.delete(f"/products/{product_id}")
+        response.raise_for_status()
+        return {"success": True, "message": f"Product {product_id} deleted"}
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return {"error": f"Product {product_id} not found"}
+        return {"error": f"Failed to delete product: {str(e)}"}
+    except httpx.HTTPError as e:
+        return {"error": f"Connection error: {str(e)}"}
+
+
+@mcp.tool()
+async def delete_products_bulk(ids: List[int]) -> dict:
+    """
+    Delete many products from the catalog in one request.
+    
+    Args:
+        ids: IDs of the products to delete (up to 1000)
+    """
+    try:
+        response = await _client.request("DELETE", "/products/bulk", json=ids)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        return {"error": f"Failed to delete products: {str(e)}"}
 
 
 @mcp.tool()
@@ -170,14 +228,21 @@ async def get_categories() -> dict:
     """
     Get all unique product categories from the database.
     """
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.get(f"{FASTAPI_BASE_URL}/categories")
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPError as e:
-            return {"error": f"Failed to fetch categories: {str(e)}"}
+    try:
+        response = await _client.get("/categories")
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        return {"error": f"Failed to fetch categories: {str(e)}"}
+
+
+async def main():
+    """Run the MCP server over stdio and close the HTTP client on exit"""
+    try:
+        await mcp.run_stdio_async()
+    finally:
+        await _client.aclose()
 
 
 if __name__ == "__main__":
-    mcp.run()
+    asyncio.run(main())
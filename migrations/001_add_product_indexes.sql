@@ -0,0 +1,7 @@
+-- Indexes for the /products filters and /categories lookup.
+-- Run once against an existing product_catalog database:
+--   mysql -u root product_catalog < migrations/001_add_product_indexes.sql
+
+CREATE INDEX ix_products_category ON products (category);
+CREATE INDEX ix_products_in_stock ON products (in_stock);
+CREATE INDEX ix_products_category_instock ON products (category, in_stock);
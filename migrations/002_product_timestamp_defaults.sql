@@ -0,0 +1,9 @@
+-- Let MySQL maintain created_at/updated_at instead of the application.
+--   mysql -u root product_catalog < migrations/002_product_timestamp_defaults.sql
+
+UPDATE products SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;
+UPDATE products SET updated_at = created_at WHERE updated_at IS NULL;
+
+ALTER TABLE products
+    MODIFY created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    MODIFY updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;